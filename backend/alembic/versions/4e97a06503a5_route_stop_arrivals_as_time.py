@@ -0,0 +1,42 @@
+"""route stop arrivals as time
+
+Revision ID: 4e97a06503a5
+Revises: e5107eead70d
+Create Date: 2026-10-15 09:12:31.418205
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e97a06503a5'
+down_revision: Union[str, None] = 'e5107eead70d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for column in ("planned_arrival", "actual_arrival"):
+        op.alter_column(
+            "route_stops",
+            column,
+            existing_type=sa.String(),
+            type_=sa.Time(),
+            existing_nullable=True,
+            postgresql_using=f"to_timestamp({column}, 'HH24:MI')::time",
+        )
+
+
+def downgrade() -> None:
+    for column in ("planned_arrival", "actual_arrival"):
+        op.alter_column(
+            "route_stops",
+            column,
+            existing_type=sa.Time(),
+            type_=sa.String(),
+            existing_nullable=True,
+            postgresql_using=f"to_char({column}, 'HH24:MI')",
+        )
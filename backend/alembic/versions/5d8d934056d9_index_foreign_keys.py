@@ -0,0 +1,49 @@
+"""index foreign keys
+
+Revision ID: 5d8d934056d9
+Revises: 4e97a06503a5
+Create Date: 2026-10-15 10:02:47.905316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d8d934056d9'
+down_revision: Union[str, None] = '4e97a06503a5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Primary keys already carry a unique index — these duplicated it.
+PK_INDEXES = [
+    ("ix_depots_id", "depots"),
+    ("ix_vehicles_id", "vehicles"),
+    ("ix_stops_id", "stops"),
+    ("ix_routes_id", "routes"),
+    ("ix_route_stops_id", "route_stops"),
+]
+
+
+def upgrade() -> None:
+    for name, table in PK_INDEXES:
+        op.drop_index(name, table_name=table)
+
+    # (route_id, sequence) covers both the filter and the ORDER BY sequence
+    op.create_index("ix_route_stops_route_id_seq", "route_stops", ["route_id", "sequence"], unique=False)
+    op.create_index("ix_route_stops_stop_id", "route_stops", ["stop_id"], unique=False)
+    op.create_index("ix_routes_vehicle_id", "routes", ["vehicle_id"], unique=False)
+    op.create_index("ix_routes_date", "routes", ["date"], unique=False)
+    op.create_index("ix_vehicles_depot_id", "vehicles", ["depot_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_vehicles_depot_id", table_name="vehicles")
+    op.drop_index("ix_routes_date", table_name="routes")
+    op.drop_index("ix_routes_vehicle_id", table_name="routes")
+    op.drop_index("ix_route_stops_stop_id", table_name="route_stops")
+    op.drop_index("ix_route_stops_route_id_seq", table_name="route_stops")
+
+    for name, table in PK_INDEXES:
+        op.create_index(name, table, ["id"], unique=False)
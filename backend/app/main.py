@@ -1,3 +1,4 @@
+import asyncio
 import logging
 
 from fastapi import FastAPI
@@ -25,18 +26,33 @@ app.include_router(simulation.router, prefix="/simulation", tags=["simulation"])
 
 @app.on_event("startup")
 async def startup():
-    # Tables are managed by Alembic (run `alembic upgrade head` before starting).
-    # create_all is kept as a safety net for fresh dev environments without Alembic.
-    from app.database import engine, Base
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
+    # Tables are managed by Alembic only — the Dockerfile runs `alembic upgrade head`
+    # once before uvicorn starts, so workers don't each touch the DB on boot.
     logger.info("=" * 50)
     logger.info("  LastMile is running!")
     logger.info("  Frontend:  http://localhost:3000")
     logger.info("  API docs:  http://localhost:8000/docs")
     logger.info("=" * 50)
 
+    # Open the shared ORS client up front so the first optimize call
+    # doesn't pay for client setup.
+    from app.services.distance_matrix import get_ors_client
+    get_ors_client()
+
+    # Pydantic v2 models already build their core schemas at import; the
+    # OpenAPI document is the one schema FastAPI builds lazily, so do it here.
+    app.openapi()
+
+    # Relay Celery job completions (Redis pub/sub) to WebSocket subscribers
+    app.state.job_relay = asyncio.create_task(routes.relay_job_events())
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    app.state.job_relay.cancel()
+    from app.services.distance_matrix import close_ors_client
+    await close_ors_client()
+
 
 @app.get("/health")
 async def health():
@@ -6,7 +6,7 @@ from app.database import Base
 class Depot(Base):
     __tablename__ = "depots"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
     lat = Column(Float, nullable=False)
     lng = Column(Float, nullable=False)
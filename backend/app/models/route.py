@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, Date, ForeignKey, String
+from sqlalchemy import Column, Integer, Float, Date, ForeignKey, Index, Time
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -7,25 +7,29 @@ from app.database import Base
 class Route(Base):
     __tablename__ = "routes"
 
-    id = Column(Integer, primary_key=True, index=True)
-    vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=False)
-    date = Column(Date, nullable=False)
+    id = Column(Integer, primary_key=True)
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=False, index=True)
+    date = Column(Date, nullable=False, index=True)
     total_distance_km = Column(Float, default=0.0)
     total_time_min = Column(Float, default=0.0)
 
     vehicle = relationship("Vehicle")
-    route_stops = relationship("RouteStop", back_populates="route", order_by="RouteStop.sequence")
+    # selectin: one batched IN query per tier — lazy loads aren't allowed under asyncio
+    route_stops = relationship("RouteStop", back_populates="route", order_by="RouteStop.sequence", lazy="selectin")
 
 
 class RouteStop(Base):
     __tablename__ = "route_stops"
+    __table_args__ = (Index("ix_route_stops_route_id_seq", "route_id", "sequence"),)
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     route_id = Column(Integer, ForeignKey("routes.id"), nullable=False)
-    stop_id = Column(Integer, ForeignKey("stops.id"), nullable=False)
+    stop_id = Column(Integer, ForeignKey("stops.id"), nullable=False, index=True)
     sequence = Column(Integer, nullable=False)
-    planned_arrival = Column(String, nullable=True)   # "HH:MM" string
-    actual_arrival = Column(String, nullable=True)
+    planned_arrival = Column(Time, nullable=True)
+    actual_arrival = Column(Time, nullable=True)
 
     route = relationship("Route", back_populates="route_stops")
-    stop = relationship("Stop")
+    # selectin by default (rerouter reads route.route_stops[i].stop); queries that
+    # join Stop themselves or don't need it override with contains_eager / noload
+    stop = relationship("Stop", lazy="selectin")
@@ -15,7 +15,7 @@ class StopStatus(str, enum.Enum):
 class Stop(Base):
     __tablename__ = "stops"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     address = Column(String, nullable=False)
     lat = Column(Float, nullable=False)
     lng = Column(Float, nullable=False)
@@ -7,8 +7,8 @@ from app.database import Base
 class Vehicle(Base):
     __tablename__ = "vehicles"
 
-    id = Column(Integer, primary_key=True, index=True)
-    depot_id = Column(Integer, ForeignKey("depots.id"), nullable=False)
+    id = Column(Integer, primary_key=True)
+    depot_id = Column(Integer, ForeignKey("depots.id"), nullable=False, index=True)
     capacity_kg = Column(Float, nullable=False)
     driver_name = Column(String, nullable=False)
 
@@ -1,16 +1,23 @@
-from datetime import date
-from typing import List
+import asyncio
+import logging
+from datetime import date, time
+from typing import Annotated, List
 
+import orjson
+import redis.asyncio as aioredis
 from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, PlainSerializer
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager, noload
 
+from app.config import settings
 from app.database import get_db
 from app.models.route import Route, RouteStop
-from app.models.stop import Stop
 from app.workers.celery_tasks import celery_app, optimize_routes_task
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
@@ -20,34 +27,74 @@ router = APIRouter()
 
 class ConnectionManager:
     def __init__(self):
-        self._connections: dict[str, list[WebSocket]] = {}
+        self._connections: dict[str, set[WebSocket]] = {}
 
     async def connect(self, route_id: str, ws: WebSocket):
         await ws.accept()
-        self._connections.setdefault(route_id, []).append(ws)
+        self._connections.setdefault(route_id, set()).add(ws)
 
     def disconnect(self, route_id: str, ws: WebSocket):
-        if route_id in self._connections:
-            self._connections[route_id].discard(ws) if hasattr(self._connections[route_id], "discard") else None
-            try:
-                self._connections[route_id].remove(ws)
-            except ValueError:
-                pass
+        sockets = self._connections.get(route_id)
+        if sockets is None:
+            return
+        sockets.discard(ws)
+        if not sockets:
+            # Job channels are one-off keys — drop them so the dict doesn't grow per job
+            del self._connections[route_id]
 
     async def broadcast(self, route_id: str, payload: dict):
-        dead = []
-        for ws in self._connections.get(route_id, []):
-            try:
-                await ws.send_json(payload)
-            except Exception:
-                dead.append(ws)
-        for ws in dead:
-            self.disconnect(route_id, ws)
+        sockets = list(self._connections.get(route_id, ()))
+        if not sockets:
+            return
+        # Serialize once and send to every client concurrently, so one slow
+        # socket doesn't hold up the rest.
+        data = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+        results = await asyncio.gather(
+            *(ws.send_bytes(data) for ws in sockets),
+            return_exceptions=True,
+        )
+        for ws, result in zip(sockets, results):
+            if isinstance(result, Exception):
+                self.disconnect(route_id, ws)
 
 
 manager = ConnectionManager()
 
 
+async def relay_job_events():
+    """
+    Forward optimization job events from Redis to WebSocket clients.
+    The Celery worker publishes on "job:<job_id>"; clients subscribed via
+    /routes/ws/jobs/{job_id} are keyed under the same channel name.
+    Runs for the lifetime of the app (started in main.py).
+    """
+    while True:
+        client = aioredis.Redis.from_url(settings.redis_url)
+        pubsub = client.pubsub()
+        try:
+            await pubsub.psubscribe("job:*")
+            async for message in pubsub.listen():
+                if message["type"] != "pmessage":
+                    continue
+                channel = message["channel"].decode()
+                try:
+                    await manager.broadcast(channel, orjson.loads(message["data"]))
+                except Exception:
+                    # One bad payload must not take down the relay for every job
+                    logger.exception("Dropped job event on %s", channel)
+        except aioredis.RedisError as exc:
+            logger.warning("Job event relay lost Redis connection (%s), retrying", exc)
+            await asyncio.sleep(1.0)
+        except Exception:
+            # Anything else would end the task silently; cancellation is a
+            # BaseException and still propagates on shutdown.
+            logger.exception("Job event relay failed, restarting")
+            await asyncio.sleep(1.0)
+        finally:
+            await pubsub.aclose()
+            await client.aclose()
+
+
 # ---------------------------------------------------------------------------
 # Request / response schemas
 # ---------------------------------------------------------------------------
@@ -63,19 +110,26 @@ class RerouteRequest(BaseModel):
     traffic_events: List[dict]  # [{"from_idx": int, "to_idx": int, "delay_factor": float}]
 
 
+# Stored as TIME; sent as "HH:MM" to match the rerouter's WebSocket payload
+ArrivalTime = Annotated[
+    time | None,
+    PlainSerializer(lambda t: t.strftime("%H:%M") if t is not None else None, return_type=str | None),
+]
+
+
 class RouteStopResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
     stop_id: int
     sequence: int
-    planned_arrival: str | None
+    planned_arrival: ArrivalTime
 
 
 class RouteStopDetail(BaseModel):
     """Full stop data including coordinates — used by the map."""
     stop_id: int
     sequence: int
-    planned_arrival: str | None
+    planned_arrival: ArrivalTime
     lat: float
     lng: float
     address: str
@@ -114,7 +168,10 @@ async def optimize(req: OptimizeRequest):
 
 @router.get("/{job_id}/status")
 async def get_job_status(job_id: str):
-    """Poll for optimization result. Status: queued → started → done / failed."""
+    """
+    Poll for optimization result. Status: queued → started → done / failed.
+    Fallback for clients that can't hold a WebSocket — prefer /ws/jobs/{job_id}.
+    """
     result = celery_app.AsyncResult(job_id)
     if result.ready():
         if result.successful():
@@ -130,6 +187,7 @@ async def get_route_stops(route_id: int, db: AsyncSession = Depends(get_db)):
         select(RouteStop)
         .where(RouteStop.route_id == route_id)
         .order_by(RouteStop.sequence)
+        .options(noload(RouteStop.stop))  # response only needs the RouteStop columns
     )
     stops = result.scalars().all()
     if not stops:
@@ -143,20 +201,25 @@ async def get_route_detail(route_id: int, db: AsyncSession = Depends(get_db)):
     Return ordered stops with full coordinates and stop metadata.
     Used by the frontend to build map polylines and marker popups.
     """
-    route_stops = (
+    # Single JOIN instead of one Stop lookup per route stop (N+1).
+    # contains_eager fills rs.stop from the joined columns, overriding the
+    # mapper's selectin load so no second IN query is sent.
+    rows = (
         await db.execute(
             select(RouteStop)
+            .join(RouteStop.stop)
+            .options(contains_eager(RouteStop.stop))
             .where(RouteStop.route_id == route_id)
             .order_by(RouteStop.sequence)
         )
     ).scalars().all()
 
-    if not route_stops:
+    if not rows:
         raise HTTPException(status_code=404, detail="Route not found")
 
     detail = []
-    for rs in route_stops:
-        stop = (await db.execute(select(Stop).where(Stop.id == rs.stop_id))).scalar_one()
+    for rs in rows:
+        stop = rs.stop
         detail.append(RouteStopDetail(
             stop_id=rs.stop_id,
             sequence=rs.sequence,
@@ -196,3 +259,25 @@ async def websocket_route(websocket: WebSocket, route_id: str):
             await websocket.receive_text()  # keep-alive ping from client
     except WebSocketDisconnect:
         manager.disconnect(route_id, websocket)
+
+
+@router.websocket("/ws/jobs/{job_id}")
+async def websocket_job(websocket: WebSocket, job_id: str):
+    """
+    WebSocket endpoint — pushes {"status": "done" | "failed", ...} once the
+    optimization job finishes, replacing status polling.
+    """
+    channel = f"job:{job_id}"
+    await manager.connect(channel, websocket)
+    try:
+        # The job may have finished before the client subscribed
+        status = await get_job_status(job_id)
+        if status["status"] in ("done", "failed"):
+            await websocket.send_bytes(orjson.dumps(status, option=orjson.OPT_SERIALIZE_NUMPY))
+        while True:
+            await websocket.receive_text()  # keep-alive ping from client
+    except WebSocketDisconnect:
+        pass
+    finally:
+        # Also runs if the status check raises (e.g. result backend down)
+        manager.disconnect(channel, websocket)
@@ -1,9 +1,17 @@
 from datetime import time
+from functools import lru_cache
 from typing import List, Tuple
 
+import numpy as np
+from numba import njit
 
+
+@lru_cache(maxsize=2048)
 def time_to_minutes(t: time) -> float:
-    """Convert a time object to minutes since midnight."""
+    """
+    Convert a time object to minutes since midnight.
+    Cached: stops share a handful of window boundaries (see simulator.TIME_WINDOWS).
+    """
     return t.hour * 60 + t.minute + t.second / 60
 
 
@@ -20,8 +28,8 @@ def check_capacity(weights: List[float], vehicle_capacity: float) -> bool:
 def validate_route(
     stops: List[dict],
     vehicle_capacity: float,
-    dist_matrix: List[List[float]],
-    time_matrix: List[List[float]],
+    dist_matrix: np.ndarray,
+    time_matrix: np.ndarray,
     depot_idx: int,
     start_time_min: float = 480.0,
 ) -> Tuple[bool, List[float]]:
@@ -29,25 +37,82 @@ def validate_route(
     Validate a full route against capacity and time window constraints.
 
     Each stop dict must have keys: idx, weight, earliest_min, latest_min.
+    Thin wrapper for one-off callers — converts the dicts to arrays once and
+    delegates to validate_route_arrays.
     Returns (is_valid, list_of_arrival_times_in_minutes).
     """
     if not check_capacity([s["weight"] for s in stops], vehicle_capacity):
         return False, []
 
-    arrival_times: List[float] = []
+    valid, arrivals = validate_route_arrays(
+        np.arange(len(stops), dtype=np.int32),
+        np.array([s["idx"] for s in stops], dtype=np.int32),
+        np.array([s["earliest_min"] for s in stops], dtype=np.float64),
+        np.array([s["latest_min"] for s in stops], dtype=np.float64),
+        time_matrix,
+        depot_idx,
+        start_time_min,
+    )
+    return valid, arrivals.tolist()
+
+
+def validate_route_arrays(
+    order: np.ndarray,
+    stop_idx: np.ndarray,
+    earliest_min: np.ndarray,
+    latest_min: np.ndarray,
+    time_matrix: np.ndarray,
+    depot_idx: int,
+    start_time_min: float = 480.0,
+) -> Tuple[bool, np.ndarray]:
+    """
+    Time window check over precomputed per-stop arrays.
+
+    order is the route as positions into stop_idx / earliest_min / latest_min;
+    stop_idx maps each stop to its row in time_matrix. Capacity is not checked
+    here — the caller compares its precomputed total weight once per route.
+    Returns (is_valid, arrival_times_in_minutes); arrivals are empty if invalid.
+    """
+    time_matrix = np.asarray(time_matrix)
+    if time_matrix.dtype != np.float32:
+        time_matrix = time_matrix.astype(np.float64, copy=False)
+    order = np.ascontiguousarray(order, dtype=np.int32)
+    arrivals = np.empty(order.shape[0], dtype=np.float64)
+
+    # Kernel is compiled per matrix dtype — float32 and float64 both stay zero-copy
+    valid = time_window_walk(
+        np.ascontiguousarray(time_matrix),
+        order,
+        np.ascontiguousarray(stop_idx, dtype=np.int32),
+        np.ascontiguousarray(earliest_min, dtype=np.float64),
+        np.ascontiguousarray(latest_min, dtype=np.float64),
+        depot_idx,
+        float(start_time_min),
+        arrivals,
+    )
+    return (True, arrivals) if valid else (False, arrivals[:0])
+
+
+@njit(cache=True, nogil=True)
+def time_window_walk(time_matrix, order, stop_idx, earliest_min, latest_min, depot_idx, start_time_min, arrivals):
+    """
+    JIT-compiled time window walk, shared by validate_route_arrays and the
+    solver's local search kernels (optimizer_numba). Writes each arrival into
+    the caller's arrivals buffer and returns False at the first missed window.
+    """
     current_time = start_time_min
     current_pos = depot_idx
 
-    for stop in stops:
-        travel = time_matrix[current_pos][stop["idx"]]
-        arrival = current_time + travel
+    for k in range(order.shape[0]):
+        s = order[k]
+        arrival = current_time + time_matrix[current_pos, stop_idx[s]]
 
-        if arrival > stop["latest_min"]:
-            return False, []
+        if arrival > latest_min[s]:
+            return False
 
         # Driver waits if they arrive before the window opens
-        current_time = max(arrival, stop["earliest_min"])
-        arrival_times.append(arrival)
-        current_pos = stop["idx"]
+        current_time = max(arrival, earliest_min[s])
+        arrivals[k] = arrival
+        current_pos = stop_idx[s]
 
-    return True, arrival_times
+    return True
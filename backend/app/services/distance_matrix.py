@@ -5,73 +5,205 @@ Primary:  OpenRouteService Matrix API — returns real driving distances and
           travel times that account for road network topology.
 Fallback: Haversine formula — straight-line distances with a fixed average
           speed assumption. Used in dev/test when ORS is unavailable.
+          City-scale inputs use the cheaper equirectangular approximation.
 
 Matrix layout: coords[0] is always the depot; coords[1..n] are stops.
-Returns (distance_matrix_km, time_matrix_minutes) as nested lists.
+Returns (distance_matrix_km, time_matrix_minutes) as NxN float32 ndarrays.
 """
 
-from typing import List, Tuple
+import asyncio
+import hashlib
+import logging
+from typing import List, Optional, Tuple
 
 import httpx
 import numpy as np
+import orjson
+import redis.asyncio as aioredis
 
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
+ORS_CACHE_TTL_S = 86_400  # road network changes slowly; one day protects the 2 000/day quota
+EARTH_RADIUS_KM = 6371.0
+EQUIRECT_MAX_SPAN_KM = 100.0  # flat-earth error: ~0.1% across a city, about 1% at this span
+
+# Shared ORS client — keeps TCP/TLS connections alive between matrix calls.
+# An AsyncClient is bound to the event loop it was first used on, so a new
+# one is created if the running loop changes (e.g. a loop closed and replaced).
+# The Redis client for the response cache follows the same rule.
+_ors_client: Optional[httpx.AsyncClient] = None
+_ors_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_cache: Optional[aioredis.Redis] = None
+_cache_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_ors_client() -> httpx.AsyncClient:
+    """Return the process-wide ORS client, creating it on first use."""
+    global _ors_client, _ors_client_loop
+    loop = asyncio.get_running_loop()
+    if _ors_client is None or _ors_client.is_closed or _ors_client_loop is not loop:
+        _ors_client = httpx.AsyncClient(
+            timeout=30.0,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20),
+        )
+        _ors_client_loop = loop
+    return _ors_client
+
+
+def _get_cache() -> aioredis.Redis:
+    global _cache, _cache_loop
+    loop = asyncio.get_running_loop()
+    if _cache is None or _cache_loop is not loop:
+        _cache = aioredis.Redis.from_url(settings.redis_url)
+        _cache_loop = loop
+    return _cache
+
+
+async def close_ors_client() -> None:
+    """Close the shared ORS client and its cache connection (called on app shutdown)."""
+    global _ors_client, _ors_client_loop, _cache, _cache_loop
+    if _ors_client is not None:
+        await _ors_client.aclose()
+    if _cache is not None:
+        await _cache.aclose()
+    _ors_client, _ors_client_loop = None, None
+    _cache, _cache_loop = None, None
+
 
 async def build_distance_matrix(
     coords: List[Tuple[float, float]],
-) -> Tuple[List[List[float]], List[List[float]]]:
+) -> Tuple[np.ndarray, np.ndarray]:
     """
     Call OpenRouteService to build an NxN distance + time matrix.
     coords is a list of (lat, lng) tuples; ORS expects [lng, lat].
     Free tier: 2 000 requests/day, up to 50 locations per request.
+
+    Results are cached in Redis keyed by the sorted location set, so a
+    re-optimization or reroute over the same depot + stops (in any order)
+    costs a GET instead of an ORS call.
     """
     locations = [[lng, lat] for lat, lng in coords]
-
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.post(
-            "https://api.openrouteservice.org/v2/matrix/driving-car",
-            headers={
-                "Authorization": settings.ors_api_key,
-                "Content-Type": "application/json",
-            },
-            json={
-                "locations": locations,
-                "metrics": ["distance", "duration"],
-                "units": "km",
-            },
-        )
-        response.raise_for_status()
-        data = response.json()
-
-    distance_matrix: List[List[float]] = data["distances"]                     # km
-    time_matrix: List[List[float]] = [[s / 60.0 for s in row] for row in data["durations"]]  # sec → min
-
-    return distance_matrix, time_matrix
+    n = len(locations)
+
+    # Fetch and cache in canonical (sorted) order, then map back to the caller's order
+    order = sorted(range(n), key=locations.__getitem__)
+    canonical = [locations[i] for i in order]
+    key = "ors:" + hashlib.blake2b(orjson.dumps(canonical), digest_size=16).hexdigest()
+
+    matrices = await _cache_get(key, n)
+    if matrices is None:
+        matrices = await _fetch_ors_matrix(canonical)
+        await _cache_set(key, matrices)
+
+    # Cached and fetched in float64; handed to the solver as float32
+    matrices = matrices.astype(np.float32)
+    inv = np.argsort(order)
+    ix = np.ix_(inv, inv)
+    return matrices[0][ix], matrices[1][ix]
+
+
+async def _fetch_ors_matrix(locations: List[List[float]]) -> np.ndarray:
+    """POST to the ORS Matrix API; returns a (2, N, N) float64 array of [km, minutes]."""
+    response = await get_ors_client().post(
+        "https://api.openrouteservice.org/v2/matrix/driving-car",
+        headers={
+            "Authorization": settings.ors_api_key,
+            "Content-Type": "application/json",
+        },
+        json={
+            "locations": locations,
+            "metrics": ["distance", "duration"],
+            "units": "km",
+        },
+    )
+    response.raise_for_status()
+    data = orjson.loads(response.content)
+
+    matrices = np.empty((2, len(locations), len(locations)), dtype=np.float64)
+    matrices[0] = data["distances"]                                             # km
+    matrices[1] = data["durations"]
+    matrices[1] /= 60.0                                                         # sec → min, in place
+    return matrices
+
+
+async def _cache_get(key: str, n: int) -> Optional[np.ndarray]:
+    try:
+        raw = await _get_cache().get(key)
+    except aioredis.RedisError as exc:
+        logger.warning("ORS cache unavailable (%s)", exc)
+        return None
+    if raw is None:
+        return None
+    return np.frombuffer(raw, dtype=np.float64).reshape(2, n, n)
+
+
+async def _cache_set(key: str, matrices: np.ndarray) -> None:
+    try:
+        await _get_cache().set(key, matrices.tobytes(), ex=ORS_CACHE_TTL_S)
+    except aioredis.RedisError as exc:
+        logger.warning("ORS cache unavailable (%s)", exc)
 
 
 def haversine_matrix(
     coords: List[Tuple[float, float]],
     avg_speed_kmh: float = 30.0,
-) -> Tuple[List[List[float]], List[List[float]]]:
+) -> Tuple[np.ndarray, np.ndarray]:
     """
     Compute NxN great-circle distance matrix using the haversine formula.
     Travel time is estimated as distance / avg_speed_kmh * 60 (minutes).
     avg_speed_kmh=30 is a conservative urban delivery speed.
+    Trig runs in float64; the matrices are returned as contiguous float32 —
+    half the bytes per cell for the solver's inner loops, and well within
+    the precision of a straight-line estimate.
     """
-    n = len(coords)
-    R = 6371.0  # Earth radius in km
+    R = EARTH_RADIUS_KM
 
     lats = np.radians([c[0] for c in coords])
     lngs = np.radians([c[1] for c in coords])
 
-    dist = np.zeros((n, n), dtype=float)
-    for i in range(n):
-        dlat = lats - lats[i]
-        dlng = lngs - lngs[i]
-        a = np.sin(dlat / 2) ** 2 + np.cos(lats[i]) * np.cos(lats) * np.sin(dlng / 2) ** 2
-        dist[i] = 2 * R * np.arcsin(np.sqrt(a))
+    # Broadcast (n, 1) against (1, n) so the whole NxN matrix is computed in
+    # a single vectorized pass instead of one Python iteration per row.
+    dlat = lats[:, None] - lats[None, :]
+    dlng = lngs[:, None] - lngs[None, :]
+    coslats = np.cos(lats)
+    a = np.sin(dlat / 2) ** 2 + coslats[:, None] * coslats[None, :] * np.sin(dlng / 2) ** 2
+    dist = (2 * R * np.arcsin(np.sqrt(a))).astype(np.float32)
+
+    # One scale factor written straight into a single output buffer (no
+    # dist / speed temporary). Kept separate from dist because callers such
+    # as the rerouter mutate the time matrix in place.
+    time_min = np.multiply(dist, np.float32(60.0 / avg_speed_kmh), out=np.empty_like(dist))
+
+    return dist, time_min
+
+
+def equirect_matrix(
+    coords: List[Tuple[float, float]],
+    avg_speed_kmh: float = 30.0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Straight-line matrices using the equirectangular approximation:
+    d = R * sqrt(dlat² + (cos(lat0) * dlng)²) with lat0 the mean latitude.
+    Only one cosine is evaluated for the whole matrix, against four trig
+    calls per cell for haversine. Inputs whose bounding box spans more than
+    EQUIRECT_MAX_SPAN_KM fall back to haversine_matrix.
+    Same output contract as haversine_matrix (float32, time in minutes).
+    """
+    lats = np.radians([c[0] for c in coords])
+    lngs = np.radians([c[1] for c in coords])
+    cos_lat0 = np.cos(lats.mean())
+
+    span = EARTH_RADIUS_KM * np.hypot(np.ptp(lats), cos_lat0 * np.ptp(lngs))
+    if span > EQUIRECT_MAX_SPAN_KM:
+        return haversine_matrix(coords, avg_speed_kmh)
+
+    dy = lats[:, None] - lats[None, :]
+    dx = cos_lat0 * (lngs[:, None] - lngs[None, :])
+    dist = (EARTH_RADIUS_KM * np.sqrt(dx * dx + dy * dy)).astype(np.float32)
 
-    time_min = (dist / avg_speed_kmh) * 60.0
+    time_min = np.multiply(dist, np.float32(60.0 / avg_speed_kmh), out=np.empty_like(dist))
 
-    return dist.tolist(), time_min.tolist()
+    return dist, time_min
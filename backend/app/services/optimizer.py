@@ -7,6 +7,8 @@ Algorithm:
   Phase 2 — 2-opt local search improvement: iteratively reverses route
              sub-segments until no improving swap exists.
              Typically reduces total distance 10–20% over greedy alone.
+  Phase 3 — Or-opt: relocates runs of 1–3 consecutive stops elsewhere in
+             the route, picking up moves 2-opt's local optimum can't reach.
 
 This is the same class of heuristic used in Amazon's DDP (Dynamic Dispatch
 Platform). Exact solvers become infeasible above ~50 stops; heuristics like
@@ -14,10 +16,12 @@ this get within 5–15% of optimal in seconds.
 """
 
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Tuple
 
 import numpy as np
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.depot import Depot
@@ -25,7 +29,8 @@ from app.models.route import Route, RouteStop
 from app.models.stop import Stop
 from app.models.vehicle import Vehicle
 from app.services.constraint_checker import time_to_minutes
-from app.services.distance_matrix import build_distance_matrix, haversine_matrix
+from app.services.distance_matrix import build_distance_matrix, equirect_matrix
+from app.services.optimizer_numba import or_opt_numba, two_opt_numba
 from app.config import settings
 
 logger = logging.getLogger(__name__)
@@ -42,34 +47,47 @@ class CVRPTWSolver:
         time_m:     NxN numpy travel-time matrix (minutes).
         depot_idx:  Index of the depot in the distance/time matrices (always 0).
         start_min:  Dispatch time in minutes since midnight (default 8:00 AM = 480).
+
+    Hot loops read per-stop fields from parallel arrays (_stop_idx, _weight,
+    _earliest_min, _latest_min) indexed by stop position, not from the dicts.
     """
 
     def __init__(
         self,
         stops: List[dict],
         vehicles: List[dict],
-        dist_matrix: List[List[float]],
-        time_matrix: List[List[float]],
+        dist_matrix: np.ndarray,
+        time_matrix: np.ndarray,
         depot_idx: int = 0,
         start_min: float = 480.0,
     ):
         self.stops = stops
         self.vehicles = vehicles
-        self.dist = np.array(dist_matrix, dtype=float)
-        self.time_m = np.array(time_matrix, dtype=float)
+        # float32 halves the NxN footprint (km / minutes need ~6 significant
+        # digits); asarray skips the copy when the producer already returns float32
+        self.dist = np.asarray(dist_matrix, dtype=np.float32)
+        self.time_m = np.asarray(time_matrix, dtype=np.float32)
         self.depot_idx = depot_idx
         self.start_min = start_min
         self.n = len(stops)
 
+        # Struct-of-arrays view of self.stops for the JIT-compiled kernels
+        self._stop_idx = np.array([s["idx"] for s in stops], dtype=np.int32)
+        self._weight = np.array([s["weight"] for s in stops], dtype=np.float64)
+        self._earliest_min = np.array([s["earliest_min"] for s in stops], dtype=np.float64)
+        self._latest_min = np.array([s["latest_min"] for s in stops], dtype=np.float64)
+
+        # Depot legs of every route, as contiguous vectors indexed by matrix row
+        self._from_depot = self.dist[depot_idx].copy()
+        self._to_depot = self.dist[:, depot_idx].copy()
+
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
     def solve(self) -> List[Dict]:
-        """Run full solve: greedy construction → 2-opt improvement."""
-        routes = self._greedy()
-        routes = [self._two_opt(r) for r in routes]
-        return routes
+        """Run full solve: greedy construction → 2-opt → Or-opt improvement."""
+        return self._improve_all(self._greedy())
 
     def score(self, routes: List[Dict]) -> Dict:
         total_dist = sum(r["dist"] for r in routes)
@@ -86,11 +104,20 @@ class CVRPTWSolver:
     # ------------------------------------------------------------------
 
     def _greedy(self) -> List[Dict]:
-        unassigned = list(range(self.n))
+        alive = np.ones(self.n, dtype=bool)   # True = not yet assigned and still assignable
         routes: List[Dict] = []
-
-        for vehicle in self.vehicles:
-            if not unassigned:
+        stop_idx, weight = self._stop_idx, self._weight
+        earliest, latest = self._earliest_min, self._latest_min
+
+        # Largest capacity among this vehicle and the ones after it: a stop
+        # heavier than that can never be assigned, so it is dropped for good
+        caps = np.array([v["capacity_kg"] for v in self.vehicles], dtype=np.float64)
+        max_cap_from = np.maximum.accumulate(caps[::-1])[::-1]
+
+        for k, vehicle in enumerate(self.vehicles):
+            alive &= weight <= max_cap_from[k]
+            remaining = int(np.count_nonzero(alive))
+            if remaining == 0:
                 break
 
             route_stops: List[int] = []
@@ -98,35 +125,29 @@ class CVRPTWSolver:
             current_time = self.start_min
             current_pos = self.depot_idx
 
-            while unassigned:
-                best_i, best_dist = None, float("inf")
-
-                for i in unassigned:
-                    s = self.stops[i]
-
-                    # Capacity check
-                    if current_load + s["weight"] > vehicle["capacity_kg"]:
-                        continue
-
-                    # Time window feasibility check
-                    travel = self.time_m[current_pos][s["idx"]]
-                    if current_time + travel > s["latest_min"]:
-                        continue
-
-                    d = self.dist[current_pos][s["idx"]]
-                    if d < best_dist:
-                        best_dist, best_i = d, i
-
-                if best_i is None:
+            while remaining:
+                # Score every remaining stop at once: capacity + time window
+                # masks, then the nearest feasible one.
+                unassigned = np.flatnonzero(alive)
+                idx = stop_idx[unassigned]
+                feas = (
+                    (current_load + weight[unassigned] <= vehicle["capacity_kg"])
+                    & (current_time + self.time_m[current_pos, idx] <= latest[unassigned])
+                )
+                if not feas.any():
                     break  # no feasible stop reachable — close this route
 
-                s = self.stops[best_i]
-                travel = self.time_m[current_pos][s["idx"]]
-                current_time = max(current_time + travel, s["earliest_min"])
-                current_load += s["weight"]
-                current_pos = s["idx"]
+                candidates = np.flatnonzero(feas)
+                pick = candidates[np.argmin(self.dist[current_pos, idx[candidates]])]
+                best_i = int(unassigned[pick])
+
+                travel = self.time_m[current_pos, stop_idx[best_i]]
+                current_time = max(current_time + travel, earliest[best_i])
+                current_load += weight[best_i]
+                current_pos = stop_idx[best_i]
                 route_stops.append(best_i)
-                unassigned.remove(best_i)
+                alive[best_i] = False
+                remaining -= 1
 
             if route_stops:
                 routes.append({
@@ -143,55 +164,79 @@ class CVRPTWSolver:
 
     def _two_opt(self, route: Dict) -> Dict:
         """
-        Iteratively try reversing every sub-segment [i+1 .. j] of the route.
+        Iteratively try reversing every sub-segment of the route.
         Accept the swap if it reduces total distance AND remains feasible.
         Stop when no improving swap is found (local optimum).
+
+        The search runs in a JIT-compiled kernel (optimizer_numba) that scores
+        each reversal by its O(1) distance delta.
         """
-        best = route["stops"][:]
-        improved = True
-
-        while improved:
-            improved = False
-            for i in range(len(best) - 1):
-                for j in range(i + 2, len(best)):
-                    candidate = best[: i + 1] + best[i + 1 : j + 1][::-1] + best[j + 1 :]
-                    if self._route_dist(candidate) < self._route_dist(best) - 1e-6:
-                        if self._feasible(candidate, route["vehicle"]):
-                            best = candidate
-                            improved = True
+        best = two_opt_numba(
+            np.asarray(route["stops"], dtype=np.int32),
+            self._stop_idx,
+            self.dist,
+            self.time_m,
+            self._weight,
+            self._earliest_min,
+            self._latest_min,
+            float(route["vehicle"]["capacity_kg"]),
+            float(self.start_min),
+            self.depot_idx,
+        ).tolist()
+        return {**route, "stops": best, "dist": self._route_dist(best)}
 
+    # ------------------------------------------------------------------
+    # Phase 3: Or-opt segment relocation
+    # ------------------------------------------------------------------
+
+    def _or_opt(self, route: Dict) -> Dict:
+        """
+        Move runs of 1, 2 or 3 consecutive stops to another position in the
+        route. Accept the move if it reduces total distance AND remains
+        feasible. Stop when no improving move is found.
+        """
+        best = or_opt_numba(
+            np.asarray(route["stops"], dtype=np.int32),
+            self._stop_idx,
+            self.dist,
+            self.time_m,
+            self._weight,
+            self._earliest_min,
+            self._latest_min,
+            float(route["vehicle"]["capacity_kg"]),
+            float(self.start_min),
+            self.depot_idx,
+        ).tolist()
         return {**route, "stops": best, "dist": self._route_dist(best)}
 
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
 
+    def _improve_all(self, routes: List[Dict]) -> List[Dict]:
+        """Local search over already-constructed routes (e.g. from _greedy)."""
+        if len(routes) > 1:
+            # Routes are independent and the local search kernels release the GIL
+            workers = min(len(routes), os.cpu_count() or 1)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                routes = list(pool.map(self._improve, routes))
+        else:
+            routes = [self._improve(r) for r in routes]
+        return routes
+
+    def _improve(self, route: Dict) -> Dict:
+        """Local search for one route: 2-opt to convergence, then Or-opt."""
+        return self._or_opt(self._two_opt(route))
+
     def _route_dist(self, stop_indices: List[int]) -> float:
         """Total route distance including depot → first stop and last stop → depot."""
         if not stop_indices:
             return 0.0
-        d = self.dist[self.depot_idx][self.stops[stop_indices[0]]["idx"]]
-        for k in range(len(stop_indices) - 1):
-            a = self.stops[stop_indices[k]]["idx"]
-            b = self.stops[stop_indices[k + 1]]["idx"]
-            d += self.dist[a][b]
-        d += self.dist[self.stops[stop_indices[-1]]["idx"]][self.depot_idx]
+        path = self._stop_idx[stop_indices]
+        d = self._from_depot[path[0]] + self._to_depot[path[-1]]
+        d += self.dist[path[:-1], path[1:]].sum()
         return float(d)
 
-    def _feasible(self, stop_indices: List[int], vehicle: dict) -> bool:
-        """Check capacity and time windows for a candidate route ordering."""
-        if sum(self.stops[i]["weight"] for i in stop_indices) > vehicle["capacity_kg"]:
-            return False
-        t = self.start_min
-        pos = self.depot_idx
-        for i in stop_indices:
-            s = self.stops[i]
-            t = max(t + self.time_m[pos][s["idx"]], s["earliest_min"])
-            if t > s["latest_min"]:
-                return False
-            pos = s["idx"]
-        return True
-
 
 # ------------------------------------------------------------------
 # Service layer — called by the Celery task
@@ -217,10 +262,10 @@ async def run_optimization(
         if settings.ors_api_key:
             dist_matrix, time_matrix = await build_distance_matrix(coords)
         else:
-            dist_matrix, time_matrix = haversine_matrix(coords)
+            dist_matrix, time_matrix = equirect_matrix(coords)
     except Exception as exc:
-        logger.warning("ORS unavailable (%s), falling back to haversine", exc)
-        dist_matrix, time_matrix = haversine_matrix(coords)
+        logger.warning("ORS unavailable (%s), falling back to straight-line distances", exc)
+        dist_matrix, time_matrix = equirect_matrix(coords)
 
     stops_data = [
         {
@@ -239,12 +284,12 @@ async def run_optimization(
 
     solver = CVRPTWSolver(stops_data, vehicles_data, dist_matrix, time_matrix, depot_idx=0)
 
-    # Benchmark: record greedy-only distance before 2-opt
+    # Construct once: the greedy routes are both the benchmark and the
+    # starting point for local search
     greedy_routes = solver._greedy()
     greedy_total = sum(r["dist"] for r in greedy_routes)
 
-    # Full solve
-    optimized_routes = solver.solve()
+    optimized_routes = solver._improve_all(greedy_routes)
     optimized_total = sum(r["dist"] for r in optimized_routes)
     improvement_pct = (
         (greedy_total - optimized_total) / greedy_total * 100 if greedy_total > 0 else 0
@@ -252,25 +297,27 @@ async def run_optimization(
 
     # Persist routes to DB
     route_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-    db_route_ids: List[int] = []
-
-    for route in optimized_routes:
-        db_route = Route(
+    db_routes = [
+        Route(
             vehicle_id=route["vehicle"]["id"],
             date=route_date,
             total_distance_km=route["dist"],
         )
-        db.add(db_route)
-        await db.flush()
-
-        for seq, stop_i in enumerate(route["stops"]):
-            db.add(RouteStop(
-                route_id=db_route.id,
-                stop_id=stops_data[stop_i]["id"],
-                sequence=seq,
-            ))
+        for route in optimized_routes
+    ]
+    db.add_all(db_routes)
+    await db.flush()  # one round trip assigns every route ID
+
+    # Single executemany INSERT for all route stops
+    route_stop_rows = [
+        {"route_id": db_route.id, "stop_id": stops_data[stop_i]["id"], "sequence": seq}
+        for db_route, route in zip(db_routes, optimized_routes)
+        for seq, stop_i in enumerate(route["stops"])
+    ]
+    if route_stop_rows:
+        await db.execute(insert(RouteStop), route_stop_rows)
 
-        db_route_ids.append(db_route.id)
+    db_route_ids: List[int] = [r.id for r in db_routes]
 
     await db.commit()
 
@@ -0,0 +1,182 @@
+"""
+JIT-compiled kernels for the CVRPTW solver's local search.
+
+The solver keeps per-stop data as parallel arrays (struct-of-arrays) indexed
+by stop position: stop_idx maps a stop to its row in the distance/time
+matrices, and weight / earliest / latest hold its load and time window.
+A route is an int32 array of stop positions in visiting order.
+
+Candidate orderings are checked with constraint_checker.time_window_walk,
+the same kernel behind validate_route_arrays. Capacity is checked once per
+route: reordering keeps the stop set, so total weight is invariant.
+
+Kernels are compiled on first call and cached on disk (cache=True), so only
+the first solve in a fresh environment pays the compile cost. Entry points
+release the GIL (nogil=True) so routes can be improved on parallel threads.
+"""
+
+import numpy as np
+from numba import njit
+
+from app.services.constraint_checker import time_window_walk
+
+
+@njit(cache=True)
+def _leg(dist, a, b):
+    """
+    dist[a, b] as float64. The solver stores matrices as float32, where one ulp
+    of a ~30 km leg sum (~4e-6) exceeds the 1e-6 acceptance threshold; deltas
+    must be formed in float64 or zero-gain moves score as improving and the
+    search flips between them forever.
+    """
+    return np.float64(dist[a, b])
+
+
+@njit(cache=True)
+def _fill_path(route, stop_idx, depot_idx, path):
+    """path = [depot, stop_idx[route[0]], ..., stop_idx[route[-1]], depot]."""
+    m = route.shape[0]
+    path[0] = depot_idx
+    for k in range(m):
+        path[k + 1] = stop_idx[route[k]]
+    path[m + 1] = depot_idx
+
+
+@njit(cache=True)
+def _fill_prefix(path, dist, fwd, bwd):
+    """Prefix sums of leg distances along path, forwards and reversed."""
+    fwd[0] = 0.0
+    bwd[0] = 0.0
+    for k in range(path.shape[0] - 1):
+        fwd[k + 1] = fwd[k] + _leg(dist, path[k], path[k + 1])
+        bwd[k + 1] = bwd[k] + _leg(dist, path[k + 1], path[k])
+
+
+@njit(cache=True, nogil=True)
+def two_opt_numba(route, stop_idx, dist, time_m, weight, earliest, latest, capacity, start_min, depot_idx):
+    """
+    Delta-evaluated 2-opt over a single route. Returns the improved ordering.
+
+    Removing edges (path[a], path[a+1]) and (path[b], path[b+1]) reverses
+    path[a+1 .. b]; the delta covers the two new boundary edges plus the
+    direction change of the reversed segment (matrices may be asymmetric).
+
+    First-improvement with "don't look" bits (Bentley): an improving move is
+    applied as soon as it is found and the scan resumes from the same a.
+    Positions a with no improving move are skipped on later passes until a
+    move touching them or their neighbours clears the bit.
+    """
+    m = route.shape[0]
+    best = route.copy()
+
+    load = 0.0
+    for k in range(m):
+        load += weight[route[k]]
+    if load > capacity:
+        return best  # no ordering can be feasible
+
+    # Scratch mirror of best: each candidate reverses one slice in place and
+    # the slice is restored on reject, so there is no full copy per candidate
+    cand = best.copy()
+    path = np.empty(m + 2, dtype=np.int64)
+    arrivals = np.empty(m, dtype=np.float64)  # scratch for time_window_walk
+    fwd = np.empty(m + 2, dtype=np.float64)
+    bwd = np.empty(m + 2, dtype=np.float64)
+    dont_look = np.zeros(m + 1, dtype=np.bool_)
+    _fill_path(best, stop_idx, depot_idx, path)
+    _fill_prefix(path, dist, fwd, bwd)
+
+    improved = True
+    while improved:
+        improved = False
+        a = 0
+        while a < m - 1:
+            if dont_look[a]:
+                a += 1
+                continue
+            found = False
+            for b in range(a + 2, m + 1):
+                p, q, r, t = path[a], path[a + 1], path[b], path[b + 1]
+                delta = (
+                    _leg(dist, p, r) + _leg(dist, q, t) - _leg(dist, p, q) - _leg(dist, r, t)
+                    + (bwd[b] - bwd[a + 1]) - (fwd[b] - fwd[a + 1])
+                )
+                if delta < -1e-6:
+                    cand[a:b] = best[a:b][::-1]
+                    if time_window_walk(time_m, cand, stop_idx, earliest, latest, depot_idx, start_min, arrivals):
+                        best, cand = cand, best
+                        cand[a:b] = best[a:b]  # resync the old buffer
+                        _fill_path(best, stop_idx, depot_idx, path)
+                        _fill_prefix(path, dist, fwd, bwd)
+                        # Wake the endpoints of both changed edges and their neighbours
+                        for k in (a - 1, a, a + 1, b - 1, b, b + 1):
+                            if 0 <= k <= m:
+                                dont_look[k] = False
+                        found = True
+                        improved = True
+                        break
+                    cand[a:b] = best[a:b]  # reject: restore the slice
+            if not found:
+                dont_look[a] = True
+                a += 1
+    return best
+
+
+@njit(cache=True, nogil=True)
+def or_opt_numba(route, stop_idx, dist, time_m, weight, earliest, latest, capacity, start_min, depot_idx):
+    """
+    Or-opt over a single route: relocate segments of 1–3 consecutive stops
+    (orientation kept) to another position. Returns the improved ordering.
+
+    In path terms the segment path[i+1 .. i+L] is cut out (prev → next
+    reconnected) and inserted on edge (path[j], path[j+1]). The internal
+    segment edges don't change, so the delta is exact for asymmetric matrices.
+    """
+    m = route.shape[0]
+    best = route.copy()
+
+    load = 0.0
+    for k in range(m):
+        load += weight[route[k]]
+    if load > capacity:
+        return best  # no ordering can be feasible
+
+    cand = np.empty_like(best)
+    path = np.empty(m + 2, dtype=np.int64)
+    arrivals = np.empty(m, dtype=np.float64)  # scratch for time_window_walk
+    _fill_path(best, stop_idx, depot_idx, path)
+
+    improved = True
+    while improved:
+        improved = False
+        for seg_len in range(1, 4):
+            for i in range(m - seg_len + 1):
+                prev, first = path[i], path[i + 1]
+                last, nxt = path[i + seg_len], path[i + seg_len + 1]
+                removed = _leg(dist, prev, nxt) - _leg(dist, prev, first) - _leg(dist, last, nxt)
+                for j in range(m + 1):
+                    if i <= j <= i + seg_len:
+                        continue  # insertion edge touches the segment itself
+                    pj, pj1 = path[j], path[j + 1]
+                    delta = removed + _leg(dist, pj, first) + _leg(dist, last, pj1) - _leg(dist, pj, pj1)
+                    if delta >= -1e-6:
+                        continue
+
+                    # Route order with best[i : i+L] moved to sit before best[j]
+                    if j < i:
+                        cand[:j] = best[:j]
+                        cand[j:j + seg_len] = best[i:i + seg_len]
+                        cand[j + seg_len:i + seg_len] = best[j:i]
+                        cand[i + seg_len:] = best[i + seg_len:]
+                    else:
+                        cand[:i] = best[:i]
+                        cand[i:j - seg_len] = best[i + seg_len:j]
+                        cand[j - seg_len:j] = best[i:i + seg_len]
+                        cand[j:] = best[j:]
+
+                    if time_window_walk(time_m, cand, stop_idx, earliest, latest, depot_idx, start_min, arrivals):
+                        best, cand = cand, best
+                        _fill_path(best, stop_idx, depot_idx, path)
+                        improved = True
+                        break  # path changed — re-read segment endpoints
+    return best
@@ -13,16 +13,16 @@ The updated payload is broadcast over WebSocket to the frontend.
 import logging
 from typing import Dict, List
 
+import numpy as np
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
 from app.models.depot import Depot
-from app.models.route import Route, RouteStop
-from app.models.stop import Stop
+from app.models.route import Route
 from app.models.vehicle import Vehicle
 from app.services.constraint_checker import time_to_minutes
-from app.services.distance_matrix import build_distance_matrix, haversine_matrix
+from app.services.distance_matrix import build_distance_matrix, equirect_matrix
 
 logger = logging.getLogger(__name__)
 
@@ -45,18 +45,9 @@ async def reroute_active(
     vehicle = (await db.execute(select(Vehicle).where(Vehicle.id == route.vehicle_id))).scalar_one()
     depot = (await db.execute(select(Depot).where(Depot.id == vehicle.depot_id))).scalar_one()
 
-    route_stops_rows = (
-        await db.execute(
-            select(RouteStop)
-            .where(RouteStop.route_id == route_id)
-            .order_by(RouteStop.sequence)
-        )
-    ).scalars().all()
-
-    stops = [
-        (await db.execute(select(Stop).where(Stop.id == rs.stop_id))).scalar_one()
-        for rs in route_stops_rows
-    ]
+    # Route.route_stops (ordered by sequence) and RouteStop.stop are selectin-loaded
+    # with the route: one IN query per tier, no per-stop SELECTs
+    stops = [rs.stop for rs in route.route_stops]
 
     coords = [(depot.lat, depot.lng)] + [(s.lat, s.lng) for s in stops]
 
@@ -64,18 +55,21 @@ async def reroute_active(
         if settings.ors_api_key:
             dist_matrix, time_matrix = await build_distance_matrix(coords)
         else:
-            dist_matrix, time_matrix = haversine_matrix(coords)
+            dist_matrix, time_matrix = equirect_matrix(coords)
     except Exception as exc:
-        logger.warning("ORS unavailable during reroute (%s), using haversine", exc)
-        dist_matrix, time_matrix = haversine_matrix(coords)
-
-    # Apply traffic delay factors to the time matrix
-    for event in traffic_events:
-        fi = event.get("from_idx", 0)
-        ti = event.get("to_idx", 0)
-        factor = event.get("delay_factor", 1.5)
-        if fi < len(time_matrix) and ti < len(time_matrix[fi]):
-            time_matrix[fi][ti] *= factor
+        logger.warning("ORS unavailable during reroute (%s), using straight-line distances", exc)
+        dist_matrix, time_matrix = equirect_matrix(coords)
+
+    # Apply traffic delay factors to the time matrix in one vectorized update.
+    # multiply.at (unlike fancy-index *=) compounds repeated edges, matching
+    # applying the events one by one. Out-of-bounds edges are skipped.
+    count = len(traffic_events)
+    fi = np.fromiter((e.get("from_idx", 0) for e in traffic_events), dtype=np.intp, count=count)
+    ti = np.fromiter((e.get("to_idx", 0) for e in traffic_events), dtype=np.intp, count=count)
+    factor = np.fromiter((e.get("delay_factor", 1.5) for e in traffic_events), dtype=np.float64, count=count)
+    n = time_matrix.shape[0]
+    mask = (fi >= 0) & (fi < n) & (ti >= 0) & (ti < n)
+    np.multiply.at(time_matrix, (fi[mask], ti[mask]), factor[mask])
 
     # Recompute ETAs along the (unchanged) stop sequence
     current_time = 480.0  # default 8:00 AM; real system would use actual departure time
@@ -84,7 +78,7 @@ async def reroute_active(
 
     for i, stop in enumerate(stops):
         matrix_idx = i + 1
-        travel = time_matrix[current_pos][matrix_idx]
+        travel = time_matrix[current_pos, matrix_idx]
         arrival = current_time + travel
         earliest = time_to_minutes(stop.earliest_time)
         current_time = max(arrival, earliest)
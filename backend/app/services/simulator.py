@@ -58,35 +58,32 @@ async def generate_scenario(
         open_time=time(6, 0),
         close_time=time(22, 0),
     )
-    db.add(depot)
-    await db.flush()
-
-    vehicles: List[Vehicle] = []
-    for i in range(num_vehicles):
-        v = Vehicle(
-            depot_id=depot.id,
+    # Vehicles reference the depot through the relationship, so the unit of
+    # work inserts depot → vehicles → stops in one flush at commit.
+    vehicles: List[Vehicle] = [
+        Vehicle(
+            depot=depot,
             capacity_kg=rng.choice(VEHICLE_CAPACITIES),
             driver_name=f"Driver {i + 1}",
         )
-        db.add(v)
-        vehicles.append(v)
-    await db.flush()
+        for i in range(num_vehicles)
+    ]
 
     stops: List[Stop] = []
     for i in range(num_stops):
         earliest, latest = rng.choice(TIME_WINDOWS)
-        s = Stop(
+        stops.append(Stop(
             address=f"{rng.randint(100, 9999)} {rng.choice(['Main', 'Oak', 'Elm', 'Pine', 'Cedar'])} St, {city.title()}",
             lat=rng.uniform(*bounds["lat"]),
             lng=rng.uniform(*bounds["lng"]),
             earliest_time=earliest,
             latest_time=latest,
             package_weight_kg=round(rng.uniform(1.0, 30.0), 1),
-        )
-        db.add(s)
-        stops.append(s)
-    await db.flush()
+        ))
 
+    db.add(depot)
+    db.add_all(vehicles)
+    db.add_all(stops)
     await db.commit()
 
     return {
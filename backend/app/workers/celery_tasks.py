@@ -1,10 +1,25 @@
 import asyncio
+import logging
+import threading
+from typing import Optional
 
+import orjson
+import redis
 from celery import Celery
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from celery.signals import task_failure, task_success, worker_process_shutdown
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
+try:
+    # Only the worker's own loop uses uvloop (see _get_runtime). No global policy
+    # is installed: the API imports this module and uvicorn picks its loop via --loop.
+    import uvloop
+except ImportError:
+    uvloop = None
+
 celery_app = Celery(
     "lastmile",
     broker=settings.celery_broker_url,
@@ -19,10 +34,54 @@ celery_app.conf.update(
     enable_utc=True,
 )
 
+# One event loop, engine and session factory per worker process, created on
+# the first task (i.e. after fork) and kept for the process lifetime so DB
+# connections — and the shared ORS client — are pooled across tasks.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_engine: Optional[AsyncEngine] = None
+_SessionLocal: Optional[async_sessionmaker] = None
+_init_lock = threading.Lock()
+
+
+def _get_runtime():
+    global _loop, _engine, _SessionLocal
+    with _init_lock:
+        if _loop is None:
+            _loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+            _engine = create_async_engine(
+                settings.database_url,
+                pool_recycle=settings.db_pool_recycle,
+                pool_pre_ping=settings.db_pool_pre_ping,
+            )
+            _SessionLocal = async_sessionmaker(_engine, expire_on_commit=False)
+    return _loop, _SessionLocal
+
+
+@worker_process_shutdown.connect
+def _dispose_runtime(**kwargs):
+    global _loop, _engine, _SessionLocal
+    if _loop is None:
+        return
+    _loop.run_until_complete(_engine.dispose())
+    _loop.close()
+    _loop, _engine, _SessionLocal = None, None, None
+
+
+# Job completion is pushed on Redis channel "job:<job_id>"; the API relays it
+# to WebSocket subscribers so clients don't have to poll /routes/{job_id}/status.
+_redis = redis.Redis.from_url(settings.redis_url)
 
-@celery_app.task(name="optimize_routes", bind=True)
+
+def _publish_job_event(job_id: str, payload: dict) -> None:
+    try:
+        _redis.publish(f"job:{job_id}", orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY))
+    except redis.RedisError as exc:
+        # Clients can still fall back to polling the status endpoint
+        logger.warning("Could not publish job %s event (%s)", job_id, exc)
+
+
+@celery_app.task(name="optimize_routes")
 def optimize_routes_task(
-    self,
     depot_id: int,
     vehicle_ids: list,
     stop_ids: list,
@@ -30,16 +89,29 @@ def optimize_routes_task(
 ):
     """
     Async optimization wrapped in a sync Celery task.
-    Creates its own DB session because Celery workers run outside the
-    FastAPI request/response lifecycle.
+    Uses the worker's own engine and event loop because Celery workers run
+    outside the FastAPI request/response lifecycle.
     """
+    loop, SessionLocal = _get_runtime()
+
     async def _run():
-        engine = create_async_engine(settings.database_url)
-        SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
         async with SessionLocal() as db:
             from app.services.optimizer import run_optimization
-            result = await run_optimization(depot_id, vehicle_ids, stop_ids, date, db)
-        await engine.dispose()
-        return result
+            return await run_optimization(depot_id, vehicle_ids, stop_ids, date, db)
+
+    return loop.run_until_complete(_run())
+
+
+# Published from signals rather than the task body: both fire after the result
+# backend has stored the outcome, so a client that connects in between and
+# checks the status endpoint already sees done/failed instead of missing the push.
+@task_success.connect
+def _publish_job_done(sender=None, result=None, **kwargs):
+    if sender.name == optimize_routes_task.name:
+        _publish_job_event(sender.request.id, {"status": "done", "result": result})
+
 
-    return asyncio.run(_run())
+@task_failure.connect
+def _publish_job_failed(sender=None, task_id=None, exception=None, **kwargs):
+    if sender.name == optimize_routes_task.name:
+        _publish_job_event(task_id, {"status": "failed", "error": str(exception)})
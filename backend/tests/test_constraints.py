@@ -1,10 +1,13 @@
 from datetime import time
 
+import numpy as np
+
 from app.services.constraint_checker import (
     check_capacity,
     check_time_window,
     time_to_minutes,
     validate_route,
+    validate_route_arrays,
 )
 
 
@@ -69,3 +72,16 @@ def test_validate_route_missed_time_window():
     stops = [{"idx": 1, "weight": 5, "earliest_min": 480, "latest_min": 481}]
     valid, _ = validate_route(stops, 100.0, dist, time_m, depot_idx=0, start_time_min=480.0)
     assert valid is False
+
+
+def test_validate_route_arrays_permuted_order():
+    time_m = np.array([[0, 1, 2], [1, 0, 1], [2, 1, 0]], dtype=float)
+    stop_idx = np.array([1, 2], dtype=np.int32)
+    earliest = np.array([480.0, 480.0])
+    latest = np.array([481.5, 720.0])
+    # Visiting idx 2 first reaches idx 1 at 483 > 481.5
+    valid, _ = validate_route_arrays(np.array([1, 0]), stop_idx, earliest, latest, time_m, 0, 480.0)
+    assert valid is False
+    valid, arrivals = validate_route_arrays(np.array([0, 1]), stop_idx, earliest, latest, time_m, 0, 480.0)
+    assert valid is True
+    assert arrivals.tolist() == [481.0, 482.0]
@@ -1,6 +1,8 @@
+import math
+
 import pytest
 
-from app.services.distance_matrix import haversine_matrix
+from app.services.distance_matrix import equirect_matrix, haversine_matrix
 
 
 def test_zero_diagonal():
@@ -37,3 +39,32 @@ def test_three_node_triangle_inequality():
     dist, _ = haversine_matrix(coords)
     # d(A,C) <= d(A,B) + d(B,C)
     assert dist[0][2] <= dist[0][1] + dist[1][2] + 1e-9
+
+
+def test_matches_scalar_haversine():
+    # Broadcast implementation must agree with the textbook per-pair formula
+    coords = [(47.6062, -122.3321), (34.0522, -118.2437), (40.7128, -74.0060), (47.62, -122.35)]
+    dist, _ = haversine_matrix(coords)
+    for i, (lat1, lng1) in enumerate(coords):
+        for j, (lat2, lng2) in enumerate(coords):
+            p1, p2 = math.radians(lat1), math.radians(lat2)
+            dp, dl = p2 - p1, math.radians(lng2 - lng1)
+            a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+            expected = 2 * 6371.0 * math.asin(math.sqrt(a))
+            assert dist[i][j] == pytest.approx(expected, rel=1e-6, abs=1e-3)
+
+
+def test_equirect_matches_haversine_city_scale():
+    # Seattle-sized box: the flat-earth approximation must stay within ~0.1%
+    coords = [(47.50, -122.45), (47.7062, -122.3321), (47.62, -122.20), (47.55, -122.30)]
+    approx, approx_t = equirect_matrix(coords)
+    exact, exact_t = haversine_matrix(coords)
+    assert approx == pytest.approx(exact, rel=2e-3, abs=1e-6)
+    assert approx_t == pytest.approx(exact_t, rel=2e-3, abs=1e-6)
+
+
+def test_equirect_falls_back_to_haversine_beyond_city_scale():
+    coords = [(47.6062, -122.3321), (34.0522, -118.2437), (40.7128, -74.0060)]
+    approx, _ = equirect_matrix(coords)
+    exact, _ = haversine_matrix(coords)
+    assert (approx == exact).all()
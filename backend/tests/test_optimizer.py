@@ -7,13 +7,17 @@ they run in milliseconds with zero external dependencies.
 Key things verified:
   - All stops get assigned (greedy covers every feasible stop)
   - 2-opt never increases total distance
+  - Or-opt relocates a misplaced stop
   - Capacity constraints are respected
   - Time window constraints are respected
   - Improvement is measurable on a known sub-optimal greedy ordering
 """
 
+import threading
+
 import pytest
 
+from app.services.distance_matrix import equirect_matrix
 from app.services.optimizer import CVRPTWSolver
 
 # ---------------------------------------------------------------------------
@@ -77,6 +81,19 @@ def test_greedy_respects_capacity():
     assert sum(len(r["stops"]) for r in routes) == 0
 
 
+def test_greedy_heavy_stop_waits_for_big_vehicle():
+    # Stop 1 only fits the second (bigger) vehicle; the rest fit either
+    stops = [dict(s, weight=200 if s["id"] == 1 else 10) for s in STOPS_4]
+    fleet = [
+        {"id": 1, "capacity_kg": 100, "driver_name": "D1"},
+        {"id": 2, "capacity_kg": 300, "driver_name": "D2"},
+    ]
+    solver = CVRPTWSolver(stops, fleet, DIST_LINEAR, DIST_LINEAR, DEPOT_IDX)
+    routes = solver._greedy()
+    assert sum(len(r["stops"]) for r in routes) == 4
+    assert 0 in routes[-1]["stops"] and routes[-1]["vehicle"]["id"] == 2
+
+
 def test_greedy_respects_time_window():
     # Travel from depot to idx=1 takes DIST_LINEAR[0][1]=1 minute.
     # Window closes at 480 — impossible to arrive before 481.
@@ -114,6 +131,42 @@ def test_two_opt_improves_known_bad_route():
     assert improved_route["dist"] <= bad_route["dist"] + 1e-6
 
 
+# ---------------------------------------------------------------------------
+# Or-opt improvement
+# ---------------------------------------------------------------------------
+
+def test_or_opt_relocates_misplaced_stop():
+    """Route 0→2→1→3→4→0 (dist 10): moving stop 1 to the front gives 8."""
+    solver = CVRPTWSolver(STOPS_4, VEHICLES_1_BIG, DIST_LINEAR, DIST_LINEAR, DEPOT_IDX)
+    bad_route = {"vehicle": VEHICLES_1_BIG[0], "stops": [1, 0, 2, 3], "dist": solver._route_dist([1, 0, 2, 3])}
+    improved_route = solver._or_opt(bad_route)
+    assert improved_route["stops"] == [0, 1, 2, 3]
+    assert improved_route["dist"] == pytest.approx(8.0)
+
+
+def test_solve_terminates_on_float32_zero_gain_moves():
+    """
+    Depot ~25 km from both stops: in float32 the legs sum to more than 1e-6
+    per ulp, so a zero-gain reversal must not score as improving both ways.
+    """
+    coords = [(47.5, -122.4), (47.688114004122895, -122.2997893946649), (47.67226935970274, -122.22784599676592)]
+    dist, time_m = equirect_matrix(coords)
+    stops = [
+        {"id": i, "idx": i, "weight": 10, "earliest_min": 480, "latest_min": 1200}
+        for i in (1, 2)
+    ]
+    solver = CVRPTWSolver(stops, [{"id": 1, "capacity_kg": 100, "driver_name": "D1"}], dist, time_m, DEPOT_IDX)
+
+    # The kernels release the GIL, so a regression would spin forever — run it
+    # on a daemon thread and fail instead of hanging the suite
+    routes = []
+    worker = threading.Thread(target=lambda: routes.extend(solver.solve()), daemon=True)
+    worker.start()
+    worker.join(timeout=30)
+    assert not worker.is_alive(), "solve() did not terminate"
+    assert sorted(routes[0]["stops"]) == [0, 1]
+
+
 def test_solve_returns_same_stop_count():
     solver = CVRPTWSolver(STOPS_4, VEHICLES_2, DIST_LINEAR, DIST_LINEAR, DEPOT_IDX)
     routes = solver.solve()
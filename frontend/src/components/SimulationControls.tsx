@@ -27,19 +27,8 @@ export function SimulationControls({ onOptimized }: Props) {
         date: new Date().toISOString().slice(0, 10),
       });
 
-      // Poll until done
-      let result: OptimizeResult | undefined;
-      for (let i = 0; i < 60; i++) {
-        await new Promise((r) => setTimeout(r, 2000));
-        const poll = await api.pollJob(job_id);
-        if (poll.status === "done" && poll.result) {
-          result = poll.result;
-          break;
-        }
-        if (poll.status === "failed") throw new Error("Optimization failed");
-      }
-
-      if (!result) throw new Error("Optimization timed out");
+      // Pushed over WebSocket when the worker finishes (polls as a fallback)
+      const result = await api.waitForJob(job_id);
 
       setStatus(`Done — ${result.improvement_pct.toFixed(1)}% improvement over greedy`);
       onOptimized(result, result.route_ids, city);
@@ -1,6 +1,7 @@
 import { useEffect, useRef, useState } from "react";
 
 const WS_BASE = import.meta.env.VITE_WS_BASE_URL ?? "ws://localhost:8000";
+const decoder = new TextDecoder();
 
 export interface RerouteEvent {
   event: "rerouted";
@@ -9,7 +10,7 @@ export interface RerouteEvent {
     stops: Array<{
       stop_id: number;
       sequence: number;
-      planned_arrival: string;
+      planned_arrival: string; // "HH:MM", same format as the REST endpoints
       planned_arrival_min: number;
       lat: number;
       lng: number;
@@ -25,11 +26,14 @@ export function useRouteWebSocket(routeId: number | null) {
     if (routeId === null) return;
 
     const ws = new WebSocket(`${WS_BASE}/routes/ws/${routeId}`);
+    ws.binaryType = "arraybuffer";
     wsRef.current = ws;
 
     ws.onmessage = (e) => {
       try {
-        setLastEvent(JSON.parse(e.data));
+        // Broadcasts arrive as binary frames of UTF-8 JSON
+        const text = typeof e.data === "string" ? e.data : decoder.decode(e.data);
+        setLastEvent(JSON.parse(text));
       } catch {
         // ignore malformed frames
       }
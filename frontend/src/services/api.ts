@@ -1,4 +1,5 @@
 const BASE = import.meta.env.VITE_API_BASE_URL ?? "http://localhost:8000";
+const WS_BASE = import.meta.env.VITE_WS_BASE_URL ?? "ws://localhost:8000";
 
 export interface SimulationConfig {
   city?: string;
@@ -34,7 +35,7 @@ export interface OptimizeResult {
 export interface RouteStop {
   stop_id: number;
   sequence: number;
-  planned_arrival: string | null;
+  planned_arrival: string | null; // "HH:MM"
 }
 
 export interface TrafficEvent {
@@ -46,7 +47,7 @@ export interface TrafficEvent {
 export interface RouteStopDetail {
   stop_id: number;
   sequence: number;
-  planned_arrival: string | null;
+  planned_arrival: string | null; // "HH:MM"
   lat: number;
   lng: number;
   address: string;
@@ -71,6 +72,66 @@ async function get<T>(path: string): Promise<T> {
   return res.json();
 }
 
+type JobStatus = { status: string; result?: OptimizeResult; error?: string };
+
+/**
+ * Wait for an optimization job to finish. Subscribes to the job's WebSocket
+ * channel (pushed by the worker via Redis pub/sub) and falls back to polling
+ * /routes/{jobId}/status if the socket can't be used.
+ */
+function waitForJob(jobId: string, timeoutMs = 120_000): Promise<OptimizeResult> {
+  return new Promise((resolve, reject) => {
+    let settled = false;
+    const finish = (status: JobStatus) => {
+      if (settled) return;
+      if (status.status === "done" && status.result) {
+        settled = true;
+        resolve(status.result);
+      } else if (status.status === "failed") {
+        settled = true;
+        reject(new Error("Optimization failed"));
+      }
+      if (settled) {
+        clearTimeout(timer);
+        ws.close();
+      }
+    };
+
+    const timer = setTimeout(() => {
+      if (settled) return;
+      settled = true;
+      ws.close();
+      reject(new Error("Optimization timed out"));
+    }, timeoutMs);
+
+    const poll = async () => {
+      while (!settled) {
+        try {
+          finish(await get<JobStatus>(`/routes/${jobId}/status`));
+        } catch (err) {
+          if (!settled) {
+            settled = true;
+            clearTimeout(timer);
+            reject(err);
+          }
+        }
+        if (!settled) await new Promise((r) => setTimeout(r, 2000));
+      }
+    };
+
+    const ws = new WebSocket(`${WS_BASE}/routes/ws/jobs/${jobId}`);
+    ws.binaryType = "arraybuffer";
+    ws.onmessage = (e) => {
+      const text = typeof e.data === "string" ? e.data : new TextDecoder().decode(e.data);
+      finish(JSON.parse(text));
+    };
+    // Fires after errors too — fall back to polling if we closed without a result
+    ws.onclose = () => {
+      if (!settled) poll();
+    };
+  });
+}
+
 export const api = {
   startSimulation: (cfg: SimulationConfig) =>
     post<SimulationResult>("/simulation/start", cfg),
@@ -79,7 +140,9 @@ export const api = {
     post<{ job_id: string; status: string }>("/routes/optimize", req),
 
   pollJob: (jobId: string) =>
-    get<{ status: string; result?: OptimizeResult }>(`/routes/${jobId}/status`),
+    get<JobStatus>(`/routes/${jobId}/status`),
+
+  waitForJob,
 
   getRouteStops: (routeId: number) =>
     get<RouteStop[]>(`/routes/${routeId}/stops`),